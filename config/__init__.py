@@ -1,5 +1,6 @@
 """Configuration package for ChatGPT Desktop Plus."""
 
 from .settings import settings
+from .watcher import ConfigWatcher
 
-__all__ = ['settings']
+__all__ = ['settings', 'ConfigWatcher']
@@ -1,8 +1,11 @@
 """Configuration settings for ChatGPT Desktop Plus."""
 
 import os
-from typing import List
-from dataclasses import dataclass
+import json
+import tomllib
+from typing import Any, Dict, List
+from dataclasses import dataclass, fields, replace
+from utils.exceptions import ConfigError
 
 @dataclass
 class AudioConfig:
@@ -11,6 +14,18 @@ class AudioConfig:
     phrase_time_limit: float = 3.0
     energy_threshold: int = 300
     dynamic_energy_threshold: bool = True
+    max_queue_size: int = 10
+    adaptive_endpointing: bool = True
+    min_pause_threshold: float = 0.3
+    max_pause_threshold: float = 1.0
+    hotword_prefix_cut: bool = False
+    hotword_prefix_window: float = 1.2
+    hotword_prefix_gap: float = 0.15
+    hotword_min_voiced: float = 0.35
+    dedup_enabled: bool = True
+    dedup_window: float = 2.0
+    dedup_similarity: float = 0.6
+    dedup_cache_size: int = 32
 
 @dataclass
 class UIConfig:
@@ -23,11 +38,60 @@ class ActionConfig:
     """Action execution configuration."""
     click_delay: float = 1.0
     max_click_attempts: int = 3
+    activation_delay: float = 0.3
+    focus_delay: float = 0.2
+    move_duration: float = 0.1
+    click_settle_delay: float = 0.2
+    retry_backoff: float = 0.5
+    input_pause: float = 0.05
+
+@dataclass
+class RecognitionConfig:
+    """Speech recognition backend configuration."""
+    primary_backend: str = "google"
+    hedging: bool = False
+    operation_timeout: float = 5.0
+    hedge_backends: List[str] = None
+    hedge_percentile: float = 95.0
+    default_hedge_delay: float = 1.0
+    min_hedge_delay: float = 0.25
+    min_latency_samples: int = 20
+    latency_window: int = 200
+    
+    def __post_init__(self):
+        if self.hedge_backends is None:
+            # A duplicate request to the primary service needs no extra dependencies
+            self.hedge_backends = ["google"]
+
+@dataclass
+class SchedulerConfig:
+    """Idle-aware listening scheduler configuration."""
+    enabled: bool = True
+    poll_interval: float = 1.0
+    pause_when_focused: bool = True
+    pause_capture: bool = False
+    idle_timeout: float = 600.0
+    long_silence: float = 30.0
+    # Chunks read per duty-cycle wakeup; onset chunks are buffered, so larger blocks lose no speech
+    duty_block_chunks: int = 4
+
+@dataclass
+class RuntimeConfig:
+    """Event loop and shutdown configuration."""
+    recognition_workers: int = 4
+    shutdown_timeout: float = 0.2
+    config_poll_interval: float = 1.0
+    profile_duration: float = 30.0
+    profile_interval: float = 0.01
+    profile_dir: str = "profiles"
 
 @dataclass
 class HotwordConfig:
     """Hotword detection configuration."""
     default_hotwords: List[str] = None
+    # Seconds a bare hotword waits for a command phrase; 0 runs the default plan at once
+    command_window: float = 0.0
+    focused_plans: List[str] = None
     
     def __post_init__(self):
         if self.default_hotwords is None:
@@ -35,29 +99,211 @@ class HotwordConfig:
                 "hi chat", "hey chat", "hai chat",
                 "hi gpt", "hey gpt", "hai gpt"
             ]
+        if self.focused_plans is None:
+            self.focused_plans = ["stop", "new_chat"]
+
+# Backends accepted without consulting speech_recognition
+KNOWN_BACKENDS = ('google', 'google_cloud', 'sphinx', 'whisper', 'whisper_api', 'wit',
+                  'bing', 'azure', 'houndify', 'ibm', 'vosk')
+
+# Bounds on top of the non-negative check every number gets: (minimum, maximum), inclusive
+LIMITS = {
+    'audio': {
+        'max_queue_size': (1, None),
+        'dedup_similarity': (0.0, 1.0),
+        'dedup_cache_size': (1, None),
+    },
+    'action': {
+        'max_click_attempts': (1, None),
+    },
+    'recognition': {
+        'hedge_percentile': (0.0, 100.0),
+        'min_latency_samples': (1, None),
+        'latency_window': (1, None),
+    },
+    'scheduler': {
+        'poll_interval': (0.01, None),
+        'duty_block_chunks': (1, None),
+    },
+    'runtime': {
+        'recognition_workers': (1, None),
+        'config_poll_interval': (0.01, None),
+        'profile_interval': (0.001, None),
+    },
+}
+
+# Keys only read at startup; None means the whole section
+RESTART_REQUIRED = {
+    'audio': ('adaptive_endpointing', 'max_queue_size'),
+    'ui': None,
+    'runtime': ('recognition_workers', 'profile_dir', 'profile_interval'),
+}
 
 class Settings:
     """Main settings class."""
     
+    SECTIONS = {
+        'audio': AudioConfig,
+        'ui': UIConfig,
+        'action': ActionConfig,
+        'hotword': HotwordConfig,
+        'recognition': RecognitionConfig,
+        'scheduler': SchedulerConfig,
+        'runtime': RuntimeConfig,
+    }
+    
     def __init__(self):
         self.audio = AudioConfig()
         self.ui = UIConfig()
         self.action = ActionConfig()
         self.hotword = HotwordConfig()
+        self.recognition = RecognitionConfig()
+        self.scheduler = SchedulerConfig()
+        self.runtime = RuntimeConfig()
+        
+        self.config_path = os.getenv('CONFIG_FILE', 'config.toml')
         
-        # Load environment variables if available
+        # Environment variables are read once and take precedence over the file on every reload
+        self._env_overrides = self._read_env()
+        
+        # Load config file and environment variables if available
+        if os.path.exists(self.config_path):
+            try:
+                self.reload(self.config_path)
+            except ConfigError as e:
+                from utils.logger import get_logger
+                get_logger(__name__).warning(f"Ignoring config file: {e}")
         self._load_from_env()
     
-    def _load_from_env(self):
-        """Load settings from environment variables."""
+    @staticmethod
+    def _read_file(path: str) -> Dict[str, Any]:
+        """Read a TOML or JSON config file."""
+        try:
+            if path.endswith('.json'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                with open(path, 'rb') as f:
+                    data = tomllib.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Failed to read {path}: {e}")
+        
+        if not isinstance(data, dict):
+            raise ConfigError(f"{path} must contain a table of sections")
+        return data
+    
+    @staticmethod
+    def _validate_value(section: str, name: str, expected: Any, value: Any) -> Any:
+        """Check a config value against its field type and limits, coercing ints to floats."""
+        if expected is bool:
+            valid = isinstance(value, bool)
+        elif expected is int:
+            valid = isinstance(value, int) and not isinstance(value, bool) and value >= 0
+        elif expected is float:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+            value = float(value) if valid else value
+        elif expected is str:
+            valid = isinstance(value, str)
+        else:  # List[str]
+            valid = isinstance(value, list) and all(isinstance(v, str) for v in value)
+        
+        if not valid:
+            raise ConfigError(f"Invalid value for {section}.{name}: {value!r}")
+        
+        low, high = LIMITS.get(section, {}).get(name, (None, None))
+        if (low is not None and value < low) or (high is not None and value > high):
+            bounds = f"at least {low}" if high is None else f"between {low} and {high}"
+            raise ConfigError(f"{section}.{name} must be {bounds}, got {value!r}")
+        return value
+    
+    @staticmethod
+    def _check_backend(name: str, backend: str) -> None:
+        """Reject recognition backends speech_recognition does not provide."""
+        if backend in KNOWN_BACKENDS:
+            return
+        import speech_recognition as sr
+        if not hasattr(sr.Recognizer, f"recognize_{backend}"):
+            raise ConfigError(f"Unknown recognition backend for recognition.{name}: {backend!r}")
+    
+    def _check_section(self, section: str, config: Any) -> None:
+        """Check constraints that span several keys of a section."""
+        if section == 'audio' and config.min_pause_threshold > config.max_pause_threshold:
+            raise ConfigError("audio.min_pause_threshold must not exceed audio.max_pause_threshold")
+        if section == 'recognition':
+            self._check_backend('primary_backend', config.primary_backend)
+            for backend in config.hedge_backends:
+                self._check_backend('hedge_backends', backend)
+        if section == 'hotword' and not config.default_hotwords:
+            raise ConfigError("hotword.default_hotwords must not be empty")
+    
+    def reload(self, path: str) -> Dict[str, Any]:
+        """Validate a config file and apply it; returns the replaced section objects.
+        
+        Each section is rebuilt from its defaults plus the file, so keys and
+        sections removed from the file revert to their defaults. Nothing is
+        applied unless the whole file is valid, and each changed section is
+        swapped as a single object so readers never see a half-updated section.
+        """
+        data = self._read_file(path)
+        
+        for section, values in data.items():
+            if section not in self.SECTIONS or not isinstance(values, dict):
+                raise ConfigError(f"Unknown config section: {section}")
+        
+        updated = {}
+        for section, config_class in self.SECTIONS.items():
+            values = data.get(section, {})
+            types = {field.name: field.type for field in fields(config_class)}
+            for name, value in values.items():
+                if name not in types:
+                    raise ConfigError(f"Unknown config key: {section}.{name}")
+                values[name] = self._validate_value(section, name, types[name], value)
+            
+            new = config_class(**{**values, **self._env_overrides.get(section, {})})
+            self._check_section(section, new)
+            if new != getattr(self, section):
+                updated[section] = new
+        
+        previous = {}
+        for section, new in updated.items():
+            previous[section] = getattr(self, section)
+            setattr(self, section, new)
+        return previous
+    
+    def restart_required(self, previous: Dict[str, Any]) -> List[str]:
+        """Get the changed keys that only take effect after a restart."""
+        changed = []
+        for section, old in previous.items():
+            if section not in RESTART_REQUIRED:
+                continue
+            names = RESTART_REQUIRED[section] or [field.name for field in fields(old)]
+            new = getattr(self, section)
+            changed += [f"{section}.{name}" for name in names
+                        if getattr(old, name) != getattr(new, name)]
+        return changed
+    
+    @staticmethod
+    def _read_env() -> Dict[str, Dict[str, Any]]:
+        """Read settings overrides from environment variables."""
+        overrides: Dict[str, Dict[str, Any]] = {}
         if os.getenv('AUDIO_ENERGY_THRESHOLD'):
-            self.audio.energy_threshold = int(os.getenv('AUDIO_ENERGY_THRESHOLD'))
+            overrides.setdefault('audio', {})['energy_threshold'] = int(os.getenv('AUDIO_ENERGY_THRESHOLD'))
         
         if os.getenv('CLICK_DELAY'):
-            self.action.click_delay = float(os.getenv('CLICK_DELAY'))
+            overrides.setdefault('action', {})['click_delay'] = float(os.getenv('CLICK_DELAY'))
+        
+        if os.getenv('RECOGNITION_HEDGING'):
+            overrides.setdefault('recognition', {})['hedging'] = \
+                os.getenv('RECOGNITION_HEDGING').lower() in ('1', 'true', 'yes')
         
         if os.getenv('ICON_PATH'):
-            self.ui.icon_path = os.getenv('ICON_PATH')
+            overrides.setdefault('ui', {})['icon_path'] = os.getenv('ICON_PATH')
+        return overrides
+    
+    def _load_from_env(self):
+        """Load settings from environment variables."""
+        for section, values in self._env_overrides.items():
+            setattr(self, section, replace(getattr(self, section), **values))
 
 # Global settings instance
 settings = Settings()
@@ -0,0 +1,67 @@
+"""Config file watcher for ChatGPT Desktop Plus."""
+
+import os
+import time
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger import get_logger
+from utils.exceptions import ConfigError
+from config.settings import settings
+
+class ConfigWatcher:
+    """Watches the config file and applies changes to running components."""
+
+    def __init__(self, path: str, listeners: List[Callable[[Dict[str, Any]], None]]):
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.listeners = listeners
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._last_mtime = self._get_mtime()
+
+    def _get_mtime(self) -> Optional[int]:
+        """Get the config file modification time, if it exists."""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """Reload the config file and push changes to listeners."""
+        started = time.perf_counter()
+        try:
+            previous = settings.reload(self.path)
+        except ConfigError as e:
+            self.failed_reloads += 1
+            self.logger.error(f"Config reload failed ({self.failed_reloads} total): {e}")
+            return False
+
+        for listener in self.listeners:
+            try:
+                listener(previous)
+            except Exception as e:
+                self.logger.error(f"Failed to apply config to {listener}: {e}")
+
+        restart = settings.restart_required(previous)
+        if restart:
+            self.logger.warning(f"Restart required to apply: {', '.join(restart)}")
+
+        self.reloads += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        changed = ', '.join(previous) or 'no changes'
+        self.logger.info(f"Config reloaded in {elapsed_ms:.1f} ms ({changed})")
+        return True
+
+    async def run(self) -> None:
+        """Poll the config file for changes until cancelled."""
+        self.logger.info(f"Watching config file: {self.path}")
+        while True:
+            await asyncio.sleep(settings.runtime.config_poll_interval)
+
+            mtime = self._get_mtime()
+            if mtime is None or mtime == self._last_mtime:
+                continue
+
+            self._last_mtime = mtime
+            self.reload()
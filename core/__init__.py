@@ -1,7 +1,12 @@
 """Core functionality package for ChatGPT Desktop Plus."""
 
+from .audio_fingerprint import FingerprintCache
 from .audio_processor import AudioProcessor
+from .endpointer import Endpointer
+from .hedged_recognizer import HedgedRecognizer
 from .hotword_detector import HotwordDetector
+from .intent_router import IntentRouter
+from .listening_scheduler import ListeningScheduler
 from .window_manager import WindowManager
 
-__all__ = ['AudioProcessor', 'HotwordDetector', 'WindowManager']
+__all__ = ['AudioProcessor', 'FingerprintCache', 'Endpointer', 'HedgedRecognizer', 'HotwordDetector', 'IntentRouter', 'ListeningScheduler', 'WindowManager']
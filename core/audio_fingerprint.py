@@ -0,0 +1,113 @@
+"""Audio fingerprinting for near-duplicate suppression in ChatGPT Desktop Plus."""
+
+import audioop
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import speech_recognition as sr
+
+FINGERPRINT_RATE = 8000
+FRAME_SAMPLES = 320  # 40 ms at 8 kHz
+HOP_SAMPLES = 80  # 10 ms hop
+MAX_ALIGNMENT_SHIFT = 10
+
+Fingerprint = List[Tuple[bool, bool]]
+
+def compute_fingerprint(audio_data: sr.AudioData) -> Fingerprint:
+    """Compute a coarse spectro-temporal hash of an audio clip.
+
+    The clip is downsampled to 8 kHz and split into overlapping 40 ms frames.
+    Each frame contributes two bits: whether its energy and its zero-crossing
+    count (a cheap proxy for spectral centroid) clearly rose relative to the
+    previous frame. Both are largely invariant to volume, so speaker echo
+    hashes like the original.
+    """
+    raw = audio_data.get_raw_data(convert_rate=FINGERPRINT_RATE, convert_width=2)
+    frame_bytes = FRAME_SAMPLES * 2
+    hop_bytes = HOP_SAMPLES * 2
+
+    energies = []
+    crossings = []
+    for start in range(0, len(raw) - frame_bytes + 1, hop_bytes):
+        frame = raw[start:start + frame_bytes]
+        energies.append(audioop.rms(frame, 2))
+        crossings.append(audioop.cross(frame, 2))
+
+    return [
+        (energies[i] > energies[i - 1] * 1.1 + 1, crossings[i] > crossings[i - 1] + 2)
+        for i in range(1, len(energies))
+    ]
+
+def similarity(a: Fingerprint, b: Fingerprint) -> float:
+    """Get the best Jaccard overlap of set bits between two fingerprints over small alignments."""
+    shorter, longer = sorted((a, b), key=len)
+    if not shorter or len(shorter) < 0.7 * len(longer):
+        return 0.0
+
+    best = 0.0
+    for shift in range(-MAX_ALIGNMENT_SHIFT, MAX_ALIGNMENT_SHIFT + 1):
+        both = 0
+        either = 0
+        for i, bits in enumerate(shorter):
+            j = i + shift
+            if 0 <= j < len(longer):
+                for x, y in zip(bits, longer[j]):
+                    both += x and y
+                    either += x or y
+        if either:
+            best = max(best, both / either)
+    return best
+
+class FingerprintCache:
+    """Small LRU of recent clip fingerprints mapped to their transcripts."""
+
+    # Transcript of a clip no backend could make sense of (e.g. a re-triggering noise)
+    UNINTELLIGIBLE = ""
+
+    def __init__(self, capacity: int, window: float, threshold: float):
+        self.capacity = capacity
+        self.window = window
+        self.threshold = threshold
+        self.entries: "OrderedDict[int, list]" = OrderedDict()
+        self._next_key = 0
+
+        self.clips = 0
+        self.suppressed = 0
+
+    def match(self, fingerprint: Fingerprint, now: float) -> Optional[Tuple[int, Optional[str]]]:
+        """Find a recent near-duplicate; returns its key and transcript (None if pending).
+
+        Clips that are pending, recognized or unintelligible are kept; clips
+        whose recognition errored are discarded, so a retry is not suppressed.
+        """
+        self.clips += 1
+        for key, (other, timestamp, transcript) in reversed(self.entries.items()):
+            if now - timestamp > self.window:
+                continue
+            if similarity(fingerprint, other) >= self.threshold:
+                self.entries.move_to_end(key)
+                self.suppressed += 1
+                return key, transcript
+        return None
+
+    def add(self, fingerprint: Fingerprint, now: float) -> int:
+        """Remember a clip that is about to be recognized."""
+        key = self._next_key
+        self._next_key += 1
+        self.entries[key] = [fingerprint, now, None]
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return key
+
+    def set_transcript(self, key: int, transcript: str) -> None:
+        """Attach the recognized transcript to a remembered clip."""
+        if key in self.entries:
+            self.entries[key][2] = transcript
+
+    def discard(self, key: int) -> None:
+        """Forget a clip whose recognition errored so a retry is not suppressed."""
+        self.entries.pop(key, None)
+
+    @property
+    def suppression_rate(self) -> float:
+        """Fraction of clips suppressed as near-duplicates."""
+        return self.suppressed / self.clips if self.clips else 0.0
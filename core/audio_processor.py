@@ -1,29 +1,51 @@
 """Speech recognition Audio processing module for ChatGPT Desktop Plus."""
 
 import speech_recognition as sr
-import threading
-import queue
-from typing import Optional, Callable
+import asyncio
+import audioop
+import time
+from typing import Optional, Callable, List, Set
 from utils.logger import get_logger
 from utils.exceptions import AudioProcessingError
+from utils.daemon_executor import DaemonThreadPoolExecutor
 from config.settings import settings
+from core.endpointer import Endpointer
+from core.hedged_recognizer import HedgedRecognizer
+from core.audio_fingerprint import FingerprintCache, compute_fingerprint
+from core.listening_scheduler import ListeningScheduler
 
 class AudioProcessor:
     """Handles audio capture and speech recognition."""
-    
-    def __init__(self, on_speech_detected: Callable[[str], None]):
+
+    def __init__(self, on_speech_detected: Callable[[str], None],
+                 scheduler: Optional[ListeningScheduler] = None):
         self.logger = get_logger(__name__)
         self.recognizer = sr.Recognizer()
         self.recognizer.energy_threshold = settings.audio.energy_threshold
         self.recognizer.dynamic_energy_threshold = settings.audio.dynamic_energy_threshold
-        
-        self.audio_queue = queue.Queue()
+        # Bound every blocking recognizer request so no call outlives shutdown indefinitely
+        self.recognizer.operation_timeout = settings.recognition.operation_timeout
+
+        self.audio_queue: Optional[asyncio.Queue] = None
         self.running = False
         self.on_speech_detected = on_speech_detected
-        
-        self.audio_worker = None
-        self.listen_worker = None
-    
+        self.scheduler = scheduler
+        self.endpointer: Optional[Endpointer] = None
+        self.hedged_recognizer: Optional[HedgedRecognizer] = None
+        self.fingerprint_cache = FingerprintCache(
+            capacity=settings.audio.dedup_cache_size,
+            window=settings.audio.dedup_window,
+            threshold=settings.audio.dedup_similarity
+        )
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._capture_executor: Optional[DaemonThreadPoolExecutor] = None
+        self._recognition_executor: Optional[DaemonThreadPoolExecutor] = None
+        self._action_executor: Optional[DaemonThreadPoolExecutor] = None
+        self._capture_future: Optional[asyncio.Future] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._recognition_tasks: Set[asyncio.Task] = set()
+
     def calibrate_microphone(self) -> None:
         """Calibrate microphone for ambient noise."""
         try:
@@ -33,95 +55,294 @@ class AudioProcessor:
                 self.logger.info(f"Energy threshold set to: {self.recognizer.energy_threshold}")
         except Exception as e:
             raise AudioProcessingError(f"Failed to calibrate microphone: {e}")
-    
-    def _process_audio_worker(self) -> None:
-        """Worker thread for processing audio from queue."""
+
+    def _enqueue_audio(self, audio_data) -> None:
+        """Put captured audio on the queue (runs on the event loop)."""
+        try:
+            self.audio_queue.put_nowait(audio_data)
+        except asyncio.QueueFull:
+            self.logger.warning("Audio queue is full, dropping audio")
+
+    async def _dispatch_audio(self) -> None:
+        """Dispatch queued audio to recognition tasks."""
         while self.running:
+            audio_data = await self.audio_queue.get()
             try:
-                audio_data = self.audio_queue.get(timeout=1)
-                if audio_data is None:
-                    continue
-                
-                threading.Thread(
-                    target=self._recognize_audio, 
-                    args=(audio_data,), 
-                    daemon=True
-                ).start()
-                
-            except queue.Empty:
-                continue
+                self._dispatch_clip(audio_data)
             except Exception as e:
-                self.logger.error(f"Error in audio processing worker: {e}")
-    
-    def _recognize_audio(self, audio_data) -> None:
+                self.logger.error(f"Error dispatching audio: {e}")
+
+    def _dispatch_clip(self, audio_data) -> None:
+        """Suppress a near-duplicate clip or start recognizing it."""
+        fingerprint_key = None
+        if settings.audio.dedup_enabled:
+            fingerprint = compute_fingerprint(audio_data)
+            now = time.monotonic()
+            duplicate = self.fingerprint_cache.match(fingerprint, now)
+            if duplicate:
+                _, transcript = duplicate
+                if transcript is None:
+                    transcript = "(pending)"
+                elif transcript == FingerprintCache.UNINTELLIGIBLE:
+                    transcript = "(unintelligible)"
+                self.logger.debug(f"Suppressed near-duplicate clip of '{transcript}'")
+                return
+            fingerprint_key = self.fingerprint_cache.add(fingerprint, now)
+
+        task = asyncio.create_task(self._recognize_audio(audio_data, fingerprint_key))
+        self._recognition_tasks.add(task)
+        task.add_done_callback(self._recognition_tasks.discard)
+
+    async def _recognize_audio(self, audio_data, fingerprint_key: Optional[int] = None) -> None:
         """Recognize speech from audio data."""
+        settled = False
         try:
-            text = self.recognizer.recognize_google(audio_data)
+            text = await self.hedged_recognizer.recognize(audio_data)
+            settled = True
+            if fingerprint_key is not None:
+                self.fingerprint_cache.set_transcript(fingerprint_key, text)
             self.logger.info(f"Recognized: {text}")
-            self.on_speech_detected(text)
-            
+            await self.loop.run_in_executor(self._action_executor, self.on_speech_detected, text)
+
         except sr.UnknownValueError:
-            pass  # Speech was unintelligible
+            # Speech was unintelligible; keep the clip so repeats of the same noise are suppressed
+            settled = True
+            if fingerprint_key is not None:
+                self.fingerprint_cache.set_transcript(fingerprint_key, FingerprintCache.UNINTELLIGIBLE)
         except sr.RequestError as e:
-            self.logger.error(f"Google Speech Recognition service error: {e}")
+            self.logger.error(f"Speech recognition service error: {e}")
         except Exception as e:
             self.logger.error(f"Unexpected error during recognition: {e}")
-    
+        finally:
+            # Errored or cancelled recognitions say nothing about the clip; allow a retry
+            if not settled and fingerprint_key is not None:
+                self.fingerprint_cache.discard(fingerprint_key)
+
+    def _capture_phrase(self, source: sr.Microphone,
+                        initial_frames: Optional[List[bytes]] = None) -> sr.AudioData:
+        """Capture a single phrase, using adaptive endpointing when enabled."""
+        if self.endpointer:
+            return self.endpointer.capture(
+                source,
+                timeout=settings.audio.timeout,
+                should_continue=lambda: self.running,
+                initial_frames=initial_frames
+            )
+
+        return self.recognizer.listen(
+            source,
+            timeout=settings.audio.timeout,
+            phrase_time_limit=settings.audio.phrase_time_limit
+        )
+
+    def _wait_for_onset(self, source: sr.Microphone) -> Optional[List[bytes]]:
+        """Energy-only duty cycle: read large blocks until one may contain speech.
+
+        Each read blocks for a whole block, so the thread wakes once per block
+        instead of once per chunk, and only chunk RMS is checked against the
+        same threshold the endpointer uses; no noise tracking or endpointing
+        runs. Returns the buffered chunks so the onset frame is endpointed at
+        full fidelity, or None if the mode changed first.
+        """
+        chunk_bytes = source.CHUNK * source.SAMPLE_WIDTH
+        while self.running and self.scheduler.mode == ListeningScheduler.DUTY_CYCLE:
+            block = source.stream.read(source.CHUNK * settings.scheduler.duty_block_chunks)
+            chunks = [block[i:i + chunk_bytes] for i in range(0, len(block), chunk_bytes)]
+            for index, chunk in enumerate(chunks):
+                if audioop.rms(chunk, source.SAMPLE_WIDTH) > self.recognizer.energy_threshold:
+                    # Keep one chunk of lead-in; the endpointer decides whether this is a phrase
+                    return chunks[max(index - 1, 0):]
+        return None
+
+    def _pause_capture(self, source: sr.Microphone) -> None:
+        """Stop the microphone stream while the scheduler pauses capture."""
+        stream = source.stream.pyaudio_stream
+        stream.stop_stream()
+        try:
+            while self.running and self.scheduler.capture_paused:
+                self.scheduler.wait_until_resumed(timeout=settings.audio.timeout)
+        finally:
+            stream.start_stream()
+
+    def _submit_audio(self, audio: sr.AudioData) -> bool:
+        """Hand captured audio to the event loop; returns False once the loop is closed."""
+        try:
+            self.loop.call_soon_threadsafe(self._enqueue_audio, audio)
+        except RuntimeError as e:
+            if not self.loop.is_closed():
+                raise
+            self.logger.warning(f"Event loop closed, stopping capture: {e}")
+            return False
+        return True
+
     def _listen_continuously(self) -> None:
-        """Main listening loop."""
+        """Main listening loop (runs in the capture executor)."""
         try:
             with sr.Microphone() as source:
+                if settings.audio.adaptive_endpointing:
+                    self.endpointer = Endpointer(
+                        self.recognizer,
+                        source.SAMPLE_RATE,
+                        source.SAMPLE_WIDTH,
+                        source.CHUNK
+                    )
+
                 while self.running:
                     try:
-                        audio = self.recognizer.listen(
-                            source,
-                            timeout=settings.audio.timeout,
-                            phrase_time_limit=settings.audio.phrase_time_limit
-                        )
-                        
-                        if not self.audio_queue.full():
-                            self.audio_queue.put(audio)
-                        else:
-                            self.logger.warning("Audio queue is full, dropping audio")
-                            
+                        initial_frames = None
+                        if self.scheduler:
+                            if self.scheduler.capture_paused:
+                                self._pause_capture(source)
+                                continue
+                            if self.endpointer and self.scheduler.mode == ListeningScheduler.DUTY_CYCLE:
+                                initial_frames = self._wait_for_onset(source)
+                                if initial_frames is None:
+                                    continue
+
+                        audio = self._capture_phrase(source, initial_frames)
+
+                        if not self.running:
+                            break
+                        if self.scheduler:
+                            self.scheduler.note_speech()
+                            if self.scheduler.recognition_paused:
+                                continue
+                        if not self._submit_audio(audio):
+                            break
+
                     except sr.WaitTimeoutError:
                         continue
                     except Exception as e:
                         self.logger.error(f"Error during listening: {e}")
-                        
+
         except Exception as e:
             raise AudioProcessingError(f"Critical error in listening loop: {e}")
-    
-    def start(self) -> None:
+
+    def _on_capture_done(self, future: asyncio.Future) -> None:
+        """Log capture loop failures."""
+        if not future.cancelled() and future.exception():
+            self.logger.error(f"{future.exception()}")
+
+    async def start(self) -> None:
         """Start audio processing."""
         if self.running:
             self.logger.warning("Audio processor is already running")
             return
-        
+
         self.logger.info("Starting audio processor...")
         self.running = True
-        
-        self.calibrate_microphone()
-        
-        self.audio_worker = threading.Thread(target=self._process_audio_worker, daemon=True)
-        self.audio_worker.start()
-        
-        self.listen_worker = threading.Thread(target=self._listen_continuously, daemon=True)
-        self.listen_worker.start()
-    
-    def stop(self) -> None:
-        """Stop audio processing."""
+        self.loop = asyncio.get_running_loop()
+        self.audio_queue = asyncio.Queue(maxsize=settings.audio.max_queue_size)
+
+        self._capture_executor = DaemonThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        self._recognition_executor = DaemonThreadPoolExecutor(
+            max_workers=settings.runtime.recognition_workers,
+            thread_name_prefix="recognition"
+        )
+        self._action_executor = DaemonThreadPoolExecutor(max_workers=1, thread_name_prefix="action")
+        self.hedged_recognizer = HedgedRecognizer(self.recognizer, self._recognition_executor)
+
+        await self.loop.run_in_executor(self._capture_executor, self.calibrate_microphone)
+
+        self._dispatch_task = asyncio.create_task(self._dispatch_audio())
+
+        self._capture_future = self.loop.run_in_executor(self._capture_executor, self._listen_continuously)
+        self._capture_future.add_done_callback(self._on_capture_done)
+
+    def apply_settings(self, previous: dict) -> None:
+        """Apply reloaded settings to the live recognizer without restarting capture."""
+        audio = previous.get('audio')
+        if audio:
+            # Only override the calibrated threshold when the configured value changed
+            if audio.energy_threshold != settings.audio.energy_threshold:
+                self.recognizer.energy_threshold = settings.audio.energy_threshold
+            self.recognizer.dynamic_energy_threshold = settings.audio.dynamic_energy_threshold
+
+            self.fingerprint_cache.capacity = settings.audio.dedup_cache_size
+            self.fingerprint_cache.window = settings.audio.dedup_window
+            self.fingerprint_cache.threshold = settings.audio.dedup_similarity
+
+        if 'recognition' in previous:
+            self.recognizer.operation_timeout = settings.recognition.operation_timeout
+            if self.hedged_recognizer:
+                self.hedged_recognizer.configure()
+
+    def get_snapshot(self) -> dict:
+        """Get queue depths and in-flight work for diagnostics."""
+        def executor_stats(executor: Optional[DaemonThreadPoolExecutor]) -> dict:
+            if not executor:
+                return {}
+            return {
+                'backlog': executor.backlog,
+                'active': executor.active,
+                'submitted': executor.submitted,
+                'finished': executor.finished,
+            }
+
+        return {
+            'running': self.running,
+            'audio_queue_depth': self.audio_queue.qsize() if self.audio_queue else 0,
+            'audio_queue_capacity': settings.audio.max_queue_size,
+            'recognitions_in_flight': len(self._recognition_tasks),
+            'capture_executor': executor_stats(self._capture_executor),
+            'recognition_executor': executor_stats(self._recognition_executor),
+            'action_executor': executor_stats(self._action_executor),
+            'hedging': self.hedged_recognizer.get_stats() if self.hedged_recognizer else {},
+            'dedup': self.get_dedup_stats(),
+        }
+
+    def get_dedup_stats(self) -> dict:
+        """Get near-duplicate suppression statistics."""
+        cache = self.fingerprint_cache
+        # Each suppressed clip would have cost one primary call plus any hedges and failovers
+        calls_per_clip = 1.0
+        if self.hedged_recognizer:
+            calls_per_clip += self.hedged_recognizer.get_stats()['extra_call_rate']
+        return {
+            'clips': cache.clips,
+            'suppressed': cache.suppressed,
+            'suppression_rate': cache.suppression_rate,
+            'calls_saved': cache.suppressed * calls_per_clip,
+        }
+
+    async def stop(self) -> None:
+        """Stop audio processing, cancelling all in-flight work."""
         if not self.running:
             return
-        
+
         self.logger.info("Stopping audio processor...")
         self.running = False
-        
-        self.audio_queue.put(None)
-        
-        if self.audio_worker:
-            self.audio_worker.join(timeout=2)
-        if self.listen_worker:
-            self.listen_worker.join(timeout=2)
-        
+
+        tasks = list(self._recognition_tasks)
+        if self._dispatch_task:
+            tasks.append(self._dispatch_task)
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=settings.runtime.shutdown_timeout)
+            if pending:
+                self.logger.warning(f"{len(pending)} task(s) did not finish within shutdown timeout")
+
+        # Blocking capture/recognition calls cannot be interrupted; their daemon workers do not hold exit
+        for executor in (self._capture_executor, self._recognition_executor, self._action_executor):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.hedged_recognizer and self.hedged_recognizer.requests:
+            stats = self.hedged_recognizer.get_stats()
+            self.logger.info(
+                f"Recognition: {stats['requests']} requests, "
+                f"hedge rate {stats['hedge_rate']:.1%}, failover rate {stats['failover_rate']:.1%}, "
+                f"cancellation rate {stats['cancellation_rate']:.1%}, "
+                f"{stats['orphaned_calls']} losing calls ran to completion "
+                f"({stats['orphaned_workers']} workers still held)"
+            )
+        if self.fingerprint_cache.clips:
+            dedup = self.get_dedup_stats()
+            self.logger.info(
+                f"Duplicate suppression: {dedup['suppressed']}/{dedup['clips']} clips "
+                f"({dedup['suppression_rate']:.1%}), ~{dedup['calls_saved']:.0f} recognizer calls saved"
+            )
+
         self.logger.info("Audio processor stopped")
@@ -0,0 +1,245 @@
+"""Adaptive endpointing for ChatGPT Desktop Plus."""
+
+import audioop
+import statistics
+import sys
+import wave
+from typing import Optional, List
+import speech_recognition as sr
+from utils.logger import get_logger
+from config.settings import settings
+
+# Speech segments per second considered a normal speaking rate
+NOMINAL_SPEAKING_RATE = 2.5
+
+class Endpointer:
+    """Detects phrase boundaries from raw audio frames with adaptive thresholds."""
+
+    START = "start"
+    PREFIX = "prefix"
+    END = "end"
+    LIMIT = "limit"
+    DISCARD = "discard"
+    DISPATCH_EVENTS = (PREFIX, END, LIMIT)
+
+    def __init__(self, recognizer: sr.Recognizer, sample_rate: int, sample_width: int,
+                 chunk: int, adaptive: bool = True):
+        self.logger = get_logger(__name__)
+        self.recognizer = recognizer
+        self.sample_width = sample_width
+        self.frame_duration = chunk / sample_rate
+        self.adaptive = adaptive
+
+        self.base_pause_threshold = recognizer.pause_threshold
+        self.pause_threshold = recognizer.pause_threshold
+        self.noise_floor: Optional[float] = None
+        self.speech_energy: Optional[float] = None
+        self.speaking_rate = NOMINAL_SPEAKING_RATE
+
+        self.in_phrase = False
+        self._after_prefix = False
+        self._reset_phrase()
+
+    def _reset_phrase(self) -> None:
+        """Reset per-phrase counters."""
+        self.phrase_time = 0.0
+        self.voiced_time = 0.0
+        self.silence_run = 0.0
+        self.segments = 0
+
+    @staticmethod
+    def _ema(current: Optional[float], value: float, alpha: float) -> float:
+        """Exponential moving average helper."""
+        return value if current is None else current + alpha * (value - current)
+
+    def _update_noise_floor(self, energy: float) -> None:
+        """Track ambient energy and follow it with the energy threshold."""
+        self.noise_floor = self._ema(self.noise_floor, energy, 0.05)
+        if self.recognizer.dynamic_energy_threshold:
+            target = self.noise_floor * self.recognizer.dynamic_energy_ratio
+            self.recognizer.energy_threshold = self._ema(self.recognizer.energy_threshold, target, 0.05)
+
+    def _adapt_pause_threshold(self) -> None:
+        """Derive the trailing-silence threshold from speaking rate and noise floor."""
+        # Trailing silence is the pause being measured, not part of the speech
+        spoken_time = self.phrase_time - self.silence_run
+        if not self.adaptive or spoken_time <= 0:
+            return
+
+        rate = self.segments / spoken_time
+        self.speaking_rate = self._ema(self.speaking_rate, rate, 0.3)
+
+        # Fast speakers leave shorter gaps; noisy rooms mask gaps and need more margin
+        rate_factor = min(max(NOMINAL_SPEAKING_RATE / max(self.speaking_rate, 0.1), 0.5), 1.5)
+        noise_factor = 1.0
+        if self.noise_floor and self.speech_energy:
+            snr = self.speech_energy / max(self.noise_floor, 1.0)
+            noise_factor = min(max(3.0 / max(snr, 0.1), 1.0), 1.5)
+
+        self.pause_threshold = min(
+            max(self.base_pause_threshold * rate_factor * noise_factor, settings.audio.min_pause_threshold),
+            settings.audio.max_pause_threshold
+        )
+        self.logger.debug(
+            f"Pause threshold {self.pause_threshold:.2f}s "
+            f"(rate {self.speaking_rate:.2f}/s, noise floor {self.noise_floor or 0:.0f})"
+        )
+
+    def _is_hotword_candidate(self) -> bool:
+        """Check whether the phrase so far has the shape of a short hotword.
+
+        This is an acoustic shape test only; there is no local keyword
+        spotter, so the cut is opt-in and allowed once per utterance (the
+        continuation is never cut again).
+        """
+        voiced_time = self.phrase_time - self.silence_run
+        return (
+            self.adaptive
+            and settings.audio.hotword_prefix_cut
+            and not self._after_prefix
+            and self.phrase_time <= settings.audio.hotword_prefix_window
+            and voiced_time >= settings.audio.hotword_min_voiced
+            and self.silence_run >= settings.audio.hotword_prefix_gap
+        )
+
+    def process(self, frame: bytes) -> Optional[str]:
+        """Feed one audio frame and return a boundary event, if any."""
+        energy = audioop.rms(frame, self.sample_width)
+        speaking = energy > self.recognizer.energy_threshold
+
+        if not self.in_phrase:
+            if not speaking:
+                self._update_noise_floor(energy)
+                return None
+            self.in_phrase = True
+            self._reset_phrase()
+            self.segments = 1
+            self.voiced_time = self.frame_duration
+            return self.START
+
+        self.phrase_time += self.frame_duration
+        if speaking:
+            if self.silence_run > 0:
+                self.segments += 1
+            self.silence_run = 0.0
+            self.voiced_time += self.frame_duration
+            self.speech_energy = self._ema(self.speech_energy, energy, 0.1)
+        else:
+            self.silence_run += self.frame_duration
+
+        event = None
+        if self._is_hotword_candidate():
+            event = self.PREFIX
+        elif self.silence_run >= self.pause_threshold:
+            event = self.END
+        elif self.phrase_time >= settings.audio.phrase_time_limit:
+            event = self.LIMIT
+
+        # Like recognizer.listen, drop phrases too short to be speech (clicks, thumps)
+        if event in (self.END, self.LIMIT) and self.voiced_time < self.recognizer.phrase_threshold:
+            self.in_phrase = False
+            self._after_prefix = False
+            return self.DISCARD
+
+        if event:
+            self._adapt_pause_threshold()
+            self.in_phrase = False
+            # The phrase following a prefix cut is its continuation and runs to a real endpoint
+            self._after_prefix = event == self.PREFIX
+        return event
+
+    def capture(self, source: sr.Microphone, timeout: Optional[float] = None,
+                should_continue=lambda: True,
+                initial_frames: Optional[List[bytes]] = None) -> sr.AudioData:
+        """Capture one phrase from an open microphone source.
+
+        initial_frames are processed before reading from the stream, so audio
+        buffered while duty cycling is endpointed at full fidelity.
+        """
+        preroll = max(int(self.recognizer.non_speaking_duration / self.frame_duration), 1)
+        frames: List[bytes] = []
+        pending = list(initial_frames or [])
+        waited = 0.0
+
+        while should_continue():
+            buffer = pending.pop(0) if pending else source.stream.read(source.CHUNK)
+            if len(buffer) == 0:
+                break
+
+            event = self.process(buffer)
+            frames.append(buffer)
+
+            if event in (None, self.DISCARD) and not self.in_phrase:
+                frames = frames[-preroll:]
+                waited += self.frame_duration
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            elif event in self.DISPATCH_EVENTS:
+                if event == self.PREFIX:
+                    self.logger.debug(f"Hotword-shaped prefix cut at {self.phrase_time:.2f}s")
+                break
+
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+def _times_to_dispatch(path: str, adaptive: bool) -> List[float]:
+    """Replay a WAV file and return, per dispatched phrase, seconds from its onset to dispatch."""
+    with wave.open(path, "rb") as wav:
+        recognizer = sr.Recognizer()
+        recognizer.energy_threshold = settings.audio.energy_threshold
+        recognizer.dynamic_energy_threshold = settings.audio.dynamic_energy_threshold
+        chunk = 1024
+        endpointer = Endpointer(recognizer, wav.getframerate(), wav.getsampwidth(), chunk, adaptive)
+
+        times = []
+        onset = 0.0
+        elapsed = 0.0
+        while True:
+            frame = wav.readframes(chunk)
+            if not frame:
+                return times
+            if wav.getnchannels() > 1:
+                frame = audioop.tomono(frame, wav.getsampwidth(), 0.5, 0.5)
+            elapsed += endpointer.frame_duration
+            event = endpointer.process(frame)
+            if event == Endpointer.START:
+                onset = elapsed
+            elif event in Endpointer.DISPATCH_EVENTS:
+                times.append(elapsed - onset)
+
+def replay_corpus(paths: List[str]) -> Optional[float]:
+    """Compare fixed and adaptive endpointing over WAV files; return median time-to-dispatch reduction.
+
+    Every phrase in a file is replayed. The adaptive threshold only moves
+    once a phrase has ended, so the first phrase of each file warms it up
+    and is left out of the comparison. Recognizer latency is the same for
+    both, so this is the endpointing share of time-to-recognition, not
+    time-to-recognition itself.
+    """
+    logger = get_logger(__name__)
+    reductions = []
+
+    for path in paths:
+        fixed = _times_to_dispatch(path, adaptive=False)[1:]
+        adaptive = _times_to_dispatch(path, adaptive=True)[1:]
+        if not fixed or not adaptive:
+            logger.warning(f"Fewer than two phrases detected in {path}, skipping")
+            continue
+        fixed_median = statistics.median(fixed)
+        adaptive_median = statistics.median(adaptive)
+        reductions.append(fixed_median - adaptive_median)
+        logger.info(
+            f"{path}: median time-to-dispatch fixed {fixed_median:.2f}s ({len(fixed)} phrase(s)), "
+            f"adaptive {adaptive_median:.2f}s ({len(adaptive)} phrase(s))"
+        )
+
+    if not reductions:
+        return None
+
+    median = statistics.median(reductions)
+    logger.info(f"Median time-to-dispatch reduction over {len(reductions)} file(s): {median * 1000:.0f} ms")
+    return median
+
+if __name__ == "__main__":
+    from utils.logger import setup_logger
+    setup_logger(__name__)
+    replay_corpus(sys.argv[1:])
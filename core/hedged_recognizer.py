@@ -0,0 +1,190 @@
+"""Hedged speech recognition across multiple backends for ChatGPT Desktop Plus."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Dict, List, Set, Tuple
+import speech_recognition as sr
+from utils.logger import get_logger
+from config.settings import settings
+
+class HedgedRecognizer:
+    """Recognizes audio with a primary backend and hedges slow requests to fallbacks."""
+
+    def __init__(self, recognizer: sr.Recognizer, executor: Executor):
+        self.logger = get_logger(__name__)
+        self.recognizer = recognizer
+        self.executor = executor
+
+        self.backends: List[str] = []
+        self.latencies = deque(maxlen=settings.recognition.latency_window)
+        self.configure()
+
+        self.requests = 0
+        self.hedges = 0
+        self.failovers = 0
+        self.hedge_wins = 0
+        self.cancellations = 0
+        self.orphaned_calls = 0
+
+        # Losing calls that were already running and still occupy a worker
+        self._orphans: Set[Future] = set()
+        self._orphans_lock = threading.Lock()
+
+    def configure(self) -> None:
+        """Apply the current recognition settings."""
+        backends = [settings.recognition.primary_backend]
+        if settings.recognition.hedging:
+            backends += settings.recognition.hedge_backends
+        self.backends = backends
+
+        if self.latencies.maxlen != settings.recognition.latency_window:
+            self.latencies = deque(self.latencies, maxlen=settings.recognition.latency_window)
+
+    def hedge_delay(self) -> float:
+        """Get the delay before hedging, from the primary's latency percentile.
+
+        Samples cut short by a winning hedge are censored: the true latency is
+        at least the recorded value and beyond the hedge delay, so they sort
+        as tail values instead of pulling the percentile down.
+        """
+        samples: List[Tuple[float, bool]] = list(self.latencies)
+        if len(samples) < settings.recognition.min_latency_samples:
+            return settings.recognition.default_hedge_delay
+
+        ordered = sorted(value if not censored else float('inf') for value, censored in samples)
+        index = int(len(ordered) * settings.recognition.hedge_percentile / 100)
+        delay = ordered[min(index, len(ordered) - 1)]
+        if delay == float('inf'):
+            delay = max(value for value, _ in samples)
+        return max(delay, settings.recognition.min_hedge_delay)
+
+    def _call_backend(self, backend: str, audio_data: sr.AudioData) -> str:
+        """Run a blocking recognize_<backend> call."""
+        recognize = getattr(self.recognizer, f"recognize_{backend}", None)
+        if recognize is None:
+            raise sr.RequestError(f"Unknown recognition backend: {backend}")
+
+        text = recognize(audio_data)
+        if not isinstance(text, str) or not text.strip():
+            raise sr.UnknownValueError()
+        return text
+
+    async def recognize(self, audio_data: sr.AudioData) -> str:
+        """Recognize audio; the first usable transcript wins and the rest are cancelled."""
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        started = time.perf_counter()
+
+        def submit(backend: str) -> asyncio.Future:
+            call = self.executor.submit(self._call_backend, backend, audio_data)
+            future = asyncio.wrap_future(call, loop=loop)
+            names[future] = backend
+            calls[future] = call
+            return future
+
+        names: Dict[asyncio.Future, str] = {}
+        calls: Dict[asyncio.Future, Future] = {}
+        remaining = iter(self.backends[1:])
+        primary = submit(self.backends[0])
+        pending = {primary}
+        errors: List[Exception] = []
+        hedged = False
+        won = False
+
+        try:
+            while pending:
+                timeout = None
+                if not hedged and len(self.backends) > 1:
+                    timeout = max(self.hedge_delay() - (time.perf_counter() - started), 0)
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    backend = next(remaining, None)
+                    if backend:
+                        self.hedges += 1
+                        hedged = True
+                        self.logger.debug(f"Primary slow, hedging to '{backend}'")
+                        pending.add(submit(backend))
+                    continue
+
+                for future in done:
+                    if future is primary:
+                        self.latencies.append((time.perf_counter() - started, False))
+                    try:
+                        text = future.result()
+                    except (sr.UnknownValueError, sr.RequestError) as e:
+                        errors.append(e)
+                        continue
+
+                    if future is not primary:
+                        self.hedge_wins += 1
+                        self.logger.debug(f"Hedge backend '{names[future]}' won")
+                    won = True
+                    return text
+
+                # Every finished backend failed; fall through to the next one immediately
+                backend = next(remaining, None)
+                if backend:
+                    self.failovers += 1
+                    hedged = True
+                    self.logger.debug(f"Backend failed, failing over to '{backend}'")
+                    pending.add(submit(backend))
+
+        finally:
+            for future in pending:
+                self.cancellations += 1
+                if future is primary and won:
+                    self.latencies.append((time.perf_counter() - started, True))
+                self._abandon(calls[future])
+                future.cancel()
+
+        request_errors = [e for e in errors if isinstance(e, sr.RequestError)]
+        if request_errors and len(request_errors) == len(errors):
+            raise request_errors[-1]
+        raise sr.UnknownValueError()
+
+    def _abandon(self, call: Future) -> None:
+        """Cancel a losing call; a call already running keeps its worker until it returns."""
+        if call.cancel():
+            return
+
+        self.orphaned_calls += 1
+        with self._orphans_lock:
+            self._orphans.add(call)
+        call.add_done_callback(self._release_orphan)
+
+    def _release_orphan(self, call: Future) -> None:
+        """Forget an orphaned call once its worker is free again."""
+        with self._orphans_lock:
+            self._orphans.discard(call)
+
+    @property
+    def orphaned_workers(self) -> int:
+        """Number of workers still busy with calls whose result was discarded."""
+        with self._orphans_lock:
+            return len(self._orphans)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hedging statistics."""
+        requests = max(self.requests, 1)
+        return {
+            'requests': self.requests,
+            'hedges': self.hedges,
+            'failovers': self.failovers,
+            'hedge_wins': self.hedge_wins,
+            'cancellations': self.cancellations,
+            'hedge_rate': self.hedges / requests,
+            'failover_rate': self.failovers / requests,
+            # Backend calls beyond the primary, per request
+            'extra_call_rate': (self.hedges + self.failovers) / requests,
+            'cancellation_rate': self.cancellations / requests,
+            'orphaned_calls': self.orphaned_calls,
+            'orphaned_workers': self.orphaned_workers,
+            'hedge_delay': self.hedge_delay(),
+        }
@@ -1,12 +1,14 @@
 """Hotword detection and action triggering for ChatGPT Desktop Plus."""
 
-from typing import List, Optional
-from pynput.keyboard import Key, Controller
+from typing import List, Optional, Tuple
+from pynput.keyboard import Controller
+import threading
 import time
 from utils.logger import get_logger
 from utils.exceptions import HotwordDetectionError
 from config.settings import settings
 from core.window_manager import WindowManager
+from core.intent_router import ActionPlan, IntentRouter
 
 class HotwordDetector:
     """Detects hotwords and triggers appropriate actions."""
@@ -18,10 +20,26 @@ class HotwordDetector:
         
         self.keyboard = Controller()
         self.window_manager = WindowManager()
+        self.router = IntentRouter()
         self.last_detected_hotword = None
         
+        # A bare hotword waits briefly for its command to arrive as the next phrase
+        self._pending: Optional[Tuple[str, bool]] = None
+        self._pending_timer: Optional[threading.Timer] = None
+        self._pending_lock = threading.Lock()
+        # Plans run on the action executor and on command-window timers; never overlap them
+        self._action_lock = threading.Lock()
+        
         self.logger.info(f"Initialized with hotwords: {', '.join(self.hotwords)}")
     
+    def apply_settings(self, previous: dict) -> None:
+        """Apply reloaded settings to the hotword matcher."""
+        if 'hotword' in previous:
+            # Swap the whole list so in-flight checks keep a consistent view
+            self.hotwords = [word.lower() for word in settings.hotword.default_hotwords]
+            self.logger.info(f"Hotwords reloaded: {', '.join(self.hotwords)}")
+        self.window_manager.apply_settings(previous)
+    
     def check_hotwords(self, text: str) -> Optional[str]:
         """Check if any hotword is present in the recognized text."""
         text_lower = text.lower()
@@ -32,59 +50,125 @@ class HotwordDetector:
         
         return None
     
-    def trigger_action(self, detected_hotword: str) -> None:
-        """Trigger the complete action sequence."""
-        self.last_detected_hotword = detected_hotword
-        self.logger.info(f"Hotword '{detected_hotword}' detected! Triggering action...")
+    def _command_text(self, detected_hotword: str, text: Optional[str]) -> str:
+        """Get the part of the phrase following the hotword."""
+        if not text:
+            return ""
+        _, _, command = text.lower().partition(detected_hotword)
+        return command.strip()
+    
+    def _take_pending(self) -> Optional[Tuple[str, bool]]:
+        """Clear the held hotword and cancel its timer (lock held)."""
+        pending, self._pending = self._pending, None
+        if self._pending_timer:
+            self._pending_timer.cancel()
+            self._pending_timer = None
+        return pending
+    
+    def handle_phrase(self, text: str, focused: bool = False) -> None:
+        """Route a recognized phrase to an action plan.
         
-        try:
-            if self.window_manager.is_chatgpt_window_open():
-                self.logger.info("ChatGPT window already open - focusing and clicking button")
-                self._handle_existing_window()
+        A phrase that is only a hotword runs the default plan at once unless
+        command_window is set (useful with audio.hotword_prefix_cut, which
+        splits the hotword from its command). Then it is held for that long
+        and the next phrase becomes its command, so "hey chat ... stop" spoken
+        as two utterances still reaches the stop plan.
+        """
+        detected_hotword = self.check_hotwords(text)
+        
+        with self._pending_lock:
+            pending = self._take_pending()
+            if detected_hotword:
+                command = self._command_text(detected_hotword, text)
+            elif pending:
+                detected_hotword, focused = pending[0], pending[1] or focused
+                command = text.lower().strip()
             else:
-                self.logger.info("ChatGPT window not open - opening new window")
-                self._handle_new_window()
-                
-        except Exception as e:
-            raise HotwordDetectionError(f"Failed to trigger action: {e}")
-    
-    def _handle_existing_window(self) -> None:
-        """Handle case where ChatGPT window is already open."""
-        chatgpt_hwnd = self.window_manager.find_chatgpt_window()
-        if chatgpt_hwnd:
-            import win32gui
-            win32gui.SetForegroundWindow(chatgpt_hwnd)
-            time.sleep(0.3)
+                return
+            
+            if not command and settings.hotword.command_window > 0:
+                self._pending = (detected_hotword, focused)
+                self._pending_timer = threading.Timer(
+                    settings.hotword.command_window, self._on_command_window_expired
+                )
+                self._pending_timer.daemon = True
+                self._pending_timer.start()
+                self.logger.info(f"Hotword '{detected_hotword}' detected, waiting for a command...")
+                return
         
-        if self.window_manager.click_microphone_button():
-            self.logger.info(f"Successfully activated microphone for existing window")
-        else:
-            self.logger.warning("Failed to click microphone button on existing window")
+        self.trigger_action(detected_hotword, command, focused)
     
-    def _handle_new_window(self) -> None:
-        """Handle case where ChatGPT window needs to be opened."""
-        # Press Alt+Space
-        with self.keyboard.pressed(Key.alt):
-            self.keyboard.press(Key.space)
-            self.keyboard.release(Key.space)
-        
-        self.logger.info("Alt+Space triggered")
+    def cancel_pending(self) -> None:
+        """Drop a held hotword without running its default plan."""
+        with self._pending_lock:
+            self._take_pending()
+    
+    def _on_command_window_expired(self) -> None:
+        """Run the default plan for a held hotword that got no command."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+            self._pending_timer = None
+        if not pending:
+            return
         
-        # Press Ctrl+N for new chat
-        with self.keyboard.pressed(Key.ctrl_l):
-            self.keyboard.press('n')
-            self.keyboard.release('n')
+        try:
+            self.trigger_action(pending[0], "", pending[1])
+        except HotwordDetectionError as e:
+            self.logger.error(f"Failed to trigger action: {e}")
+    
+    def trigger_action(self, detected_hotword: str, command: str = "", focused: bool = False) -> None:
+        """Route a command to an action plan and run it.
         
-        self.logger.info("Ctrl+N triggered")
+        While ChatGPT is focused only the plans in hotword.focused_plans run,
+        so dictation that happens to contain a hotword does not click the
+        microphone.
+        """
+        self.last_detected_hotword = detected_hotword
+        plan = self.router.route(command)
+        if focused and plan.name not in settings.hotword.focused_plans:
+            self.logger.info(
+                f"Hotword '{detected_hotword}' ignored: '{plan.name}' plan is not allowed while ChatGPT is focused"
+            )
+            return
+        self.logger.info(f"Hotword '{detected_hotword}' detected! Running '{plan.name}' plan...")
         
-        # Wait for window to appear
-        time.sleep(settings.action.click_delay)
+        try:
+            with self._action_lock:
+                started = time.perf_counter()
+                self._run_plan(plan)
+                elapsed = time.perf_counter() - started
+            plan.record(elapsed)
+            self.logger.info(f"Plan '{plan.name}' completed in {elapsed * 1000:.0f} ms")
+            
+        except Exception as e:
+            raise HotwordDetectionError(f"Failed to trigger action: {e}")
+    
+    def _run_plan(self, plan: ActionPlan) -> None:
+        """Execute the plan variant matching the current window state."""
+        hwnd = self.window_manager.get_chatgpt_window()
+        steps = plan.open_steps if hwnd else plan.closed_steps
+        self.logger.info(f"ChatGPT window {'open' if hwnd else 'not open'}")
         
-        # Click microphone button
-        if self.window_manager.click_microphone_button():
-            self.logger.info(f"Complete action sequence successful")
-        else:
-            self.logger.warning("Microphone button click failed")
+        for kind, arg in steps:
+            if kind == 'keys':
+                modifiers, key = arg
+                with self.keyboard.pressed(*modifiers):
+                    self.keyboard.press(key)
+                    self.keyboard.release(key)
+            elif kind == 'focus':
+                if hwnd:
+                    self.window_manager.focus_window(hwnd)
+            elif kind == 'wait':
+                time.sleep(arg())
+            elif kind == 'click':
+                # A window opened by this plan is only known after the preceding steps
+                hwnd = hwnd or self.window_manager.get_chatgpt_window()
+                if not self.window_manager.click_microphone_target(hwnd):
+                    self.logger.warning("Microphone button click failed")
+    
+    def get_plan_stats(self) -> dict:
+        """Get per-plan latency statistics."""
+        return self.router.get_stats()
     
     def add_hotword(self, hotword: str) -> None:
         """Add a new hotword."""
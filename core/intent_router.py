@@ -0,0 +1,161 @@
+"""Intent routing from recognized phrases to action plans for ChatGPT Desktop Plus."""
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from pynput.keyboard import Key
+from utils.exceptions import HotwordDetectionError
+from config.settings import settings
+
+# Step kinds: ('keys', 'mod+key'), ('focus',), ('wait', '<action setting>'), ('click', 'microphone')
+NEW_WINDOW_STEPS = [
+    ('keys', 'alt+space'),
+    ('keys', 'ctrl_l+n'),
+    ('wait', 'click_delay'),
+    ('click', 'microphone'),
+]
+
+DEFAULT_PLANS = {
+    'activate': {
+        'open': [('focus',), ('wait', 'activation_delay'), ('click', 'microphone')],
+        'closed': NEW_WINDOW_STEPS,
+    },
+    'focus': {
+        'open': [('focus',)],
+        'closed': [('keys', 'alt+space')],
+    },
+    'new_chat': {
+        'open': [('focus',), ('keys', 'ctrl_l+n'), ('wait', 'click_delay'), ('click', 'microphone')],
+        'closed': NEW_WINDOW_STEPS,
+    },
+    'stop': {
+        'open': [('focus',), ('wait', 'activation_delay'), ('click', 'microphone')],
+        'closed': [],
+    },
+}
+
+# Patterns are matched against the text following the hotword, in order
+DEFAULT_INTENTS = [
+    (r"\bnew (chat|conversation)\b", 'new_chat'),
+    (r"\b(stop|cancel)\b", 'stop'),
+    (r"\b(focus|show)\b", 'focus'),
+]
+
+DEFAULT_PLAN = 'activate'
+
+Step = Tuple[str, Any]
+
+@dataclass
+class ActionPlan:
+    """A validated action plan with resolved steps and latency statistics."""
+    name: str
+    open_steps: List[Step]
+    closed_steps: List[Step]
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100))
+    runs: int = 0
+    # Plans run on the action executor while stats are read from other threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, elapsed: float) -> None:
+        """Record one execution time in seconds."""
+        with self._lock:
+            self.runs += 1
+            self.latencies.append(elapsed)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get latency statistics in milliseconds."""
+        with self._lock:
+            runs = self.runs
+            ordered = sorted(self.latencies)
+
+        if not ordered:
+            return {'runs': runs}
+
+        return {
+            'runs': runs,
+            'p50_ms': ordered[len(ordered) // 2] * 1000,
+            'p95_ms': ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
+
+class IntentRouter:
+    """Maps phrases to precompiled action plans with a single regex lookup."""
+
+    def __init__(self, plans: Optional[Dict[str, Dict[str, List[tuple]]]] = None,
+                 intents: Optional[List[Tuple[str, str]]] = None,
+                 default_plan: str = DEFAULT_PLAN):
+        plans = plans or DEFAULT_PLANS
+        intents = intents if intents is not None else DEFAULT_INTENTS
+
+        self.plans = {
+            name: ActionPlan(
+                name,
+                [self._compile_step(name, step) for step in variants.get('open', [])],
+                [self._compile_step(name, step) for step in variants.get('closed', [])]
+            )
+            for name, variants in plans.items()
+        }
+
+        if default_plan not in self.plans:
+            raise HotwordDetectionError(f"Unknown default plan: {default_plan}")
+        self.default_plan = self.plans[default_plan]
+
+        # One alternation with a named group per intent; the matching group names the plan
+        self._group_plans: Dict[str, ActionPlan] = {}
+        alternatives = []
+        for index, (pattern, plan_name) in enumerate(intents):
+            if plan_name not in self.plans:
+                raise HotwordDetectionError(f"Intent '{pattern}' routes to unknown plan '{plan_name}'")
+            group = f"intent{index}"
+            self._group_plans[group] = self.plans[plan_name]
+            alternatives.append(f"(?P<{group}>{pattern})")
+
+        try:
+            self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        except re.error as e:
+            raise HotwordDetectionError(f"Invalid intent pattern: {e}")
+
+    @staticmethod
+    def _resolve_key(name: str) -> Any:
+        """Resolve a key name to a pynput key or character."""
+        if len(name) == 1:
+            return name
+        key = getattr(Key, name, None)
+        if key is None:
+            raise HotwordDetectionError(f"Unknown key: {name}")
+        return key
+
+    def _compile_step(self, plan_name: str, step: tuple) -> Step:
+        """Validate a step and resolve its arguments once."""
+        kind = step[0]
+        arg = step[1] if len(step) > 1 else None
+
+        if kind == 'keys':
+            keys = [self._resolve_key(name) for name in arg.split('+')]
+            return kind, (keys[:-1], keys[-1])
+        if kind == 'wait':
+            if isinstance(arg, (int, float)):
+                return kind, lambda: arg
+            if not hasattr(settings.action, arg):
+                raise HotwordDetectionError(f"Plan '{plan_name}' waits on unknown setting: {arg}")
+            # Read at run time so reloaded timings apply
+            return kind, lambda: getattr(settings.action, arg)
+        if kind == 'focus':
+            return kind, None
+        if kind == 'click':
+            if arg != 'microphone':
+                raise HotwordDetectionError(f"Plan '{plan_name}' clicks unknown target: {arg}")
+            return kind, arg
+
+        raise HotwordDetectionError(f"Plan '{plan_name}' has unknown step: {kind}")
+
+    def route(self, text: str) -> ActionPlan:
+        """Get the action plan for a phrase."""
+        match = self._pattern.search(text) if self._pattern else None
+        return self._group_plans[match.lastgroup] if match else self.default_plan
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get latency statistics for every plan."""
+        return {name: plan.get_stats() for name, plan in self.plans.items()}
@@ -0,0 +1,164 @@
+"""Idle-aware listening scheduler for ChatGPT Desktop Plus."""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+import psutil
+from utils.logger import get_logger
+from config.settings import settings
+from core.window_manager import WindowManager
+
+class ListeningScheduler:
+    """Switches listening between full, duty-cycled and paused modes."""
+
+    ACTIVE = "active"
+    DUTY_CYCLE = "duty_cycle"
+    PAUSED = "paused"
+    MODES = (ACTIVE, DUTY_CYCLE, PAUSED)
+
+    FOCUS_REASON = "ChatGPT window in foreground"
+
+    def __init__(self, window_manager: WindowManager):
+        self.logger = get_logger(__name__)
+        self.window_manager = window_manager
+
+        self.mode = self.ACTIVE
+        self.pause_reason: Optional[str] = None
+        self.last_speech = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._process = psutil.Process()
+
+        self.mode_time: Dict[str, float] = {mode: 0.0 for mode in self.MODES}
+        self.mode_cpu: Dict[str, float] = {mode: 0.0 for mode in self.MODES}
+        self._mode_since = time.monotonic()
+        self._cpu_since = self._cpu_time()
+
+    def _cpu_time(self) -> float:
+        """Get total CPU seconds used by this process."""
+        times = self._process.cpu_times()
+        return times.user + times.system
+
+    def _account(self) -> None:
+        """Charge elapsed wall and CPU time to the current mode (lock held)."""
+        now = time.monotonic()
+        cpu = self._cpu_time()
+        self.mode_time[self.mode] += now - self._mode_since
+        self.mode_cpu[self.mode] += cpu - self._cpu_since
+        self._mode_since = now
+        self._cpu_since = cpu
+
+    def _set_mode(self, mode: str, reason: Optional[str] = None) -> None:
+        """Switch to a new listening mode."""
+        with self._lock:
+            if mode == self.mode and reason == self.pause_reason:
+                return
+            self._account()
+            self.mode = mode
+            self.pause_reason = reason
+
+        if mode == self.PAUSED:
+            self._resumed.clear()
+            self.logger.info(f"Listening paused: {reason}")
+        else:
+            self._resumed.set()
+            self.logger.info(f"Listening mode: {mode}")
+
+    def note_speech(self) -> None:
+        """Record a captured phrase; leaves duty-cycled mode immediately."""
+        self.last_speech = time.monotonic()
+        if self.mode == self.DUTY_CYCLE:
+            self._set_mode(self.ACTIVE)
+
+    def _get_pause_reason(self) -> Optional[str]:
+        """Check whether listening should be paused."""
+        if self.window_manager.is_session_locked():
+            return "session locked"
+        if settings.scheduler.pause_when_focused and self.window_manager.is_chatgpt_foreground():
+            return self.FOCUS_REASON
+        return None
+
+    def _should_duty_cycle(self) -> bool:
+        """Check whether listening can drop to the cheap onset-only mode.
+
+        An idle keyboard and mouse is exactly when a voice hotword is used, so
+        idleness only reduces the listening rate and never pauses it. Speech
+        counts as activity, so a user talking to the assistant is not idle.
+        """
+        since_speech = time.monotonic() - self.last_speech
+        if since_speech >= settings.scheduler.long_silence:
+            return True
+        if not settings.scheduler.idle_timeout:
+            return False
+        idle = min(self.window_manager.get_idle_seconds(), since_speech)
+        return idle >= settings.scheduler.idle_timeout
+
+    def update(self) -> None:
+        """Re-evaluate the listening mode."""
+        reason = self._get_pause_reason()
+        if reason:
+            self._set_mode(self.PAUSED, reason)
+        elif self._should_duty_cycle():
+            self._set_mode(self.DUTY_CYCLE)
+        else:
+            self._set_mode(self.ACTIVE)
+
+    async def run(self) -> None:
+        """Poll system state until cancelled."""
+        while True:
+            if settings.scheduler.enabled:
+                try:
+                    self.update()
+                except Exception as e:
+                    self.logger.error(f"Error updating listening mode: {e}")
+            elif self.mode != self.ACTIVE:
+                self._set_mode(self.ACTIVE)
+            await asyncio.sleep(settings.scheduler.poll_interval)
+
+    def wait_until_resumed(self, timeout: float) -> bool:
+        """Block until listening is no longer paused or the timeout expires."""
+        return self._resumed.wait(timeout)
+
+    @property
+    def commands_only(self) -> bool:
+        """Whether only explicit hotword commands may run (ChatGPT is focused).
+
+        Recognition keeps running so commands such as "hey chat stop" still
+        reach the focused window.
+        """
+        with self._lock:
+            return self.mode == self.PAUSED and self.pause_reason == self.FOCUS_REASON
+
+    @property
+    def recognition_paused(self) -> bool:
+        """Whether captured audio should be discarded instead of recognized."""
+        return self.mode == self.PAUSED and not self.commands_only
+
+    @property
+    def capture_paused(self) -> bool:
+        """Whether the microphone stream should be stopped."""
+        return self.recognition_paused and settings.scheduler.pause_capture
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get time and CPU spent per mode, and CPU saved versus full-rate listening."""
+        with self._lock:
+            self._account()
+            mode_time = dict(self.mode_time)
+            mode_cpu = dict(self.mode_cpu)
+
+        active_time = mode_time[self.ACTIVE]
+        active_rate = mode_cpu[self.ACTIVE] / active_time if active_time else 0.0
+
+        # CPU the reduced modes would have used at the active rate, minus what they used
+        cpu_saved = sum(
+            max(active_rate * mode_time[mode] - mode_cpu[mode], 0.0)
+            for mode in (self.DUTY_CYCLE, self.PAUSED)
+        )
+
+        stats = {f"{mode}_seconds": mode_time[mode] for mode in self.MODES}
+        stats.update({f"{mode}_cpu_seconds": mode_cpu[mode] for mode in self.MODES})
+        stats['cpu_saved_seconds'] = cpu_saved
+        return stats
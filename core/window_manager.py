@@ -1,8 +1,11 @@
 """Window management for ChatGPT Desktop Plus."""
 
+import win32api
 import win32gui
 import win32con
 import win32process
+import win32service
+import pywintypes
 import psutil
 import pyautogui
 import time
@@ -17,7 +20,15 @@ class WindowManager:
     def __init__(self):
         self.logger = get_logger(__name__)
         pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.05
+        pyautogui.PAUSE = settings.action.input_pause
+        
+        self._window_cache: Optional[int] = None
+        self._target_cache: Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int]]] = None
+    
+    def apply_settings(self, previous: dict) -> None:
+        """Apply reloaded settings; timings are read from settings on each use."""
+        if 'action' in previous:
+            pyautogui.PAUSE = settings.action.input_pause
     
     def _get_window_process_name(self, hwnd: int) -> str:
         """Get the process name for a given window handle."""
@@ -83,6 +94,41 @@ class WindowManager:
         self.logger.info(f"ChatGPT window detection: {'OPEN' if result else 'CLOSED'}")
         return result
     
+    def is_chatgpt_foreground(self) -> bool:
+        """Check if the foreground window belongs to ChatGPT."""
+        hwnd = win32gui.GetForegroundWindow()
+        if not hwnd:
+            return False
+        
+        process_name = self._get_window_process_name(hwnd)
+        if 'chatgpt' in process_name or 'openai' in process_name:
+            return True
+        
+        try:
+            class_name = win32gui.GetClassName(hwnd).lower()
+        except Exception:
+            return False
+        return 'chatgpt' in class_name or 'openai' in class_name
+    
+    def is_session_locked(self) -> bool:
+        """Check if the workstation is locked.
+        
+        The input desktop can only be opened by this session while it is
+        unlocked; a missing foreground window (e.g. a focused desktop or a
+        minimised app) is not a lock.
+        """
+        try:
+            desktop = win32service.OpenInputDesktop(0, False, win32con.DESKTOP_SWITCHDESKTOP)
+        except pywintypes.error:
+            return True
+        desktop.CloseDesktop()
+        return False
+    
+    def get_idle_seconds(self) -> float:
+        """Get seconds since the last keyboard or mouse input."""
+        idle_ms = win32api.GetTickCount() - win32api.GetLastInputInfo()
+        return max(idle_ms, 0) / 1000.0
+    
     def find_chatgpt_window(self) -> Optional[int]:
         """Find ChatGPT popup window using multiple detection methods."""
         def enum_windows_callback(hwnd, windows):
@@ -129,31 +175,75 @@ class WindowManager:
         
         return None
     
+    def get_chatgpt_window(self) -> Optional[int]:
+        """Get the ChatGPT window, reusing the cached handle while it stays valid."""
+        hwnd = self._window_cache
+        if hwnd and win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd):
+            return hwnd
+        
+        self._window_cache = self.find_chatgpt_window()
+        return self._window_cache
+    
+    def focus_window(self, hwnd: int) -> None:
+        """Bring a window to the foreground."""
+        win32gui.SetForegroundWindow(hwnd)
+    
+    def _button_position(self, rect: Tuple[int, int, int, int]) -> Tuple[int, int]:
+        """Get the microphone button position for a window rect, cached per geometry."""
+        if self._target_cache and self._target_cache[0] == rect:
+            return self._target_cache[1]
+        
+        # Button sits in the bottom-right area
+        _, _, right, bottom = rect
+        search_right = right - 10
+        search_bottom = bottom - 20
+        
+        position = (search_right - 30, search_bottom - 30)
+        self._target_cache = (rect, position)
+        return position
+    
+    def _click_at(self, x: int, y: int) -> bool:
+        """Move to and click a screen position if it is on screen."""
+        screen_width, screen_height = pyautogui.size()
+        if not (0 <= x <= screen_width and 0 <= y <= screen_height):
+            self.logger.warning(f"Button position ({x}, {y}) out of bounds")
+            return False
+        
+        pyautogui.moveTo(x, y, duration=settings.action.move_duration)
+        time.sleep(settings.action.move_duration)
+        pyautogui.click(x, y)
+        
+        self.logger.info(f"Clicked microphone button at ({x}, {y})")
+        time.sleep(settings.action.click_settle_delay)
+        return True
+    
+    def click_microphone_target(self, hwnd: Optional[int]) -> bool:
+        """Click the microphone button using cached window geometry, falling back to a full search."""
+        if hwnd:
+            try:
+                x, y = self._button_position(win32gui.GetWindowRect(hwnd))
+                if self._click_at(x, y):
+                    return True
+            except Exception as e:
+                self.logger.debug(f"Cached microphone target failed: {e}")
+            self._window_cache = None
+        
+        return self.click_microphone_button()
+    
     def find_microphone_button(self) -> Optional[Tuple[int, int]]:
         """Find the microphone button coordinates."""
         try:
             chatgpt_hwnd = self.find_chatgpt_window()
             if chatgpt_hwnd:
                 rect = win32gui.GetWindowRect(chatgpt_hwnd)
-                left, top, right, bottom = rect
                 
                 self.logger.info(f"ChatGPT window bounds: {rect}")
                 
                 # Focus the window
                 win32gui.SetForegroundWindow(chatgpt_hwnd)
-                time.sleep(0.2)
-                
-                # Calculate button position in bottom-right area
-                window_width = right - left
-                window_height = bottom - top
-                
-                search_right = right - 10
-                search_bottom = bottom - 20
+                time.sleep(settings.action.focus_delay)
                 
-                button_x = search_right - 30
-                button_y = search_bottom - 30
-                
-                return (button_x, button_y)
+                return self._button_position(rect)
             
             # Fallback to screen coordinates
             screen_width, screen_height = pyautogui.size()
@@ -169,23 +259,11 @@ class WindowManager:
                 self.logger.info(f"Microphone button click attempt {attempt + 1}")
                 
                 if attempt > 0:
-                    time.sleep(0.5 * attempt)
+                    time.sleep(settings.action.retry_backoff * attempt)
                 
                 button_pos = self.find_microphone_button()
-                if button_pos:
-                    x, y = button_pos
-                    
-                    screen_width, screen_height = pyautogui.size()
-                    if 0 <= x <= screen_width and 0 <= y <= screen_height:
-                        pyautogui.moveTo(x, y, duration=0.1)
-                        time.sleep(0.1)
-                        pyautogui.click(x, y)
-                        
-                        self.logger.info(f"Clicked microphone button at ({x}, {y})")
-                        time.sleep(0.2)
-                        return True
-                    else:
-                        self.logger.warning(f"Button position ({x}, {y}) out of bounds")
+                if button_pos and self._click_at(*button_pos):
+                    return True
                 
             except Exception as e:
                 self.logger.error(f"Click attempt {attempt + 1} failed: {e}")
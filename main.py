@@ -1,5 +1,8 @@
 """Main entry point for ChatGPT Desktop Plus."""
 
+import argparse
+import asyncio
+import atexit
 import time
 import sys
 from typing import Optional
@@ -7,26 +10,52 @@ from pynput.keyboard import Key, Controller
 
 from utils.logger import setup_logger, get_logger
 from utils.exceptions import VoiceAssistantError
+from utils.profiler import SamplingProfiler
 from config.settings import settings
+from config.watcher import ConfigWatcher
 from core.audio_processor import AudioProcessor
 from core.hotword_detector import HotwordDetector
 from core.window_manager import WindowManager
+from core.listening_scheduler import ListeningScheduler
 from ui.tray_manager import TrayManager
 
 class ChatGPTDesktopPlus:
     """Main application class for ChatGPT Desktop Plus."""
     
-    def __init__(self):
+    def __init__(self, profile_on_start: Optional[float] = None):
         self.logger = setup_logger(__name__)
         self.running = False
         self.listening = True
         
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._quit_requested_at: Optional[float] = None
+        self.last_shutdown_ms: Optional[float] = None
+        self.time_to_quit_ms: Optional[float] = None
+        
         # Initialize components
         self.hotword_detector = HotwordDetector()
-        self.audio_processor = AudioProcessor(self._on_speech_detected)
         self.window_manager = WindowManager()
+        self.scheduler = ListeningScheduler(self.window_manager)
+        self.audio_processor = AudioProcessor(self._on_speech_detected, self.scheduler)
         self.tray_manager = None
         self.keyboard = Controller()
+        self.config_watcher = ConfigWatcher(
+            settings.config_path,
+            listeners=[
+                self.audio_processor.apply_settings,
+                self.hotword_detector.apply_settings,
+                self.window_manager.apply_settings
+            ]
+        )
+        self._config_task: Optional[asyncio.Task] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self.profiler = SamplingProfiler(
+            settings.runtime.profile_dir,
+            interval=settings.runtime.profile_interval,
+            snapshot_func=self._get_snapshot
+        )
+        self.profile_on_start = profile_on_start
         
         self.logger.info("ChatGPT Desktop Plus initialized")
     
@@ -35,12 +64,10 @@ class ChatGPTDesktopPlus:
         if not self.listening:
             return
         
-        detected_hotword = self.hotword_detector.check_hotwords(text)
-        if detected_hotword:
-            try:
-                self.hotword_detector.trigger_action(detected_hotword)
-            except Exception as e:
-                self.logger.error(f"Failed to trigger action: {e}")
+        try:
+            self.hotword_detector.handle_phrase(text, focused=self.scheduler.commands_only)
+        except Exception as e:
+            self.logger.error(f"Failed to trigger action: {e}")
     
     def _toggle_listening(self, icon=None, item=None) -> None:
         """Toggle listening state."""
@@ -83,6 +110,37 @@ class ChatGPTDesktopPlus:
         hotwords = self.hotword_detector.get_hotwords()
         self.logger.info(f"Configured hotwords: {', '.join(hotwords)}")
     
+    def _get_snapshot(self) -> dict:
+        """Get a snapshot of queue depths and in-flight work (safe from any thread).
+        
+        The state is read on the event loop that owns it, so the snapshot
+        never races with tasks mutating queues and latency windows.
+        """
+        # During shutdown the loop may be blocked waiting for the profiler itself
+        if not self.running or not self.loop or self.loop.is_closed():
+            raise VoiceAssistantError("Snapshot skipped: application is shutting down")
+        
+        async def collect() -> dict:
+            return self._collect_snapshot()
+        
+        return asyncio.run_coroutine_threadsafe(collect(), self.loop).result(timeout=1.0)
+    
+    def _collect_snapshot(self) -> dict:
+        """Collect the snapshot (event loop only)."""
+        return {
+            'listening': self.listening,
+            'listening_mode': self.scheduler.mode,
+            'pause_reason': self.scheduler.pause_reason,
+            'audio': self.audio_processor.get_snapshot(),
+            'action_plans': self.hotword_detector.get_plan_stats(),
+            'config_reloads': self.config_watcher.reloads,
+            'config_failed_reloads': self.config_watcher.failed_reloads,
+        }
+    
+    def _start_profile(self, icon=None, item=None) -> None:
+        """Profile all threads for the configured duration."""
+        self.profiler.start(settings.runtime.profile_duration)
+    
     def _quit_application(self, icon=None, item=None) -> None:
         """Quit the application."""
         self.logger.info("Quitting application...")
@@ -93,7 +151,14 @@ class ChatGPTDesktopPlus:
         return self.listening
     
     def start(self) -> None:
-        """Start the ChatGPT Desktop Plus."""
+        """Start the ChatGPT Desktop Plus and block until it stops."""
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            self.logger.info("Received interrupt signal")
+    
+    async def _run(self) -> None:
+        """Run the application on the asyncio event loop."""
         if self.running:
             self.logger.warning("ChatGPT Desktop Plus is already running")
             return
@@ -101,6 +166,8 @@ class ChatGPTDesktopPlus:
         try:
             self.logger.info("Starting ChatGPT Desktop Plus...")
             self.running = True
+            self.loop = asyncio.get_running_loop()
+            self._stop_event = asyncio.Event()
             
             # Setup tray manager
             test_functions = {
@@ -114,49 +181,108 @@ class ChatGPTDesktopPlus:
                 on_toggle_listening=self._toggle_listening,
                 on_test_functions=test_functions,
                 on_quit=self._quit_application,
-                is_listening_func=self._is_listening
+                is_listening_func=self._is_listening,
+                on_profile=self._start_profile
             )
             
             # Start components
             self.tray_manager.start()
-            self.audio_processor.start()
+            await self.audio_processor.start()
+            self._config_task = asyncio.create_task(self.config_watcher.run())
+            self._scheduler_task = asyncio.create_task(self.scheduler.run())
             
             self.logger.info("ChatGPT Desktop Plus started successfully")
             
-            # Keep main thread alive
-            try:
-                while self.running:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                self.logger.info("Received interrupt signal")
+            if self.profile_on_start:
+                self.profiler.start(self.profile_on_start)
+            
+            await self._stop_event.wait()
             
         except Exception as e:
             self.logger.error(f"Failed to start ChatGPT Desktop Plus: {e}")
             raise VoiceAssistantError(f"Startup failed: {e}")
         finally:
-            self.stop()
+            await self._shutdown()
     
     def stop(self) -> None:
-        """Stop the ChatGPT Desktop Plus."""
+        """Request the ChatGPT Desktop Plus to stop (safe from any thread)."""
+        if self._quit_requested_at is None:
+            self._quit_requested_at = time.perf_counter()
+        
+        if self.loop and self._stop_event:
+            try:
+                self.loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+    
+    async def _shutdown(self) -> None:
+        """Cancel all work and stop components within the shutdown timeout."""
         if not self.running:
             return
         
+        if self._quit_requested_at is None:
+            self._quit_requested_at = time.perf_counter()
+        started = self._quit_requested_at
         self.logger.info("Stopping ChatGPT Desktop Plus...")
         self.running = False
         
         # Stop components
+        for task in (self._config_task, self._scheduler_task):
+            if task:
+                task.cancel()
+        
         if self.audio_processor:
-            self.audio_processor.stop()
+            await self.audio_processor.stop()
+        self.hotword_detector.cancel_pending()
         
         if self.tray_manager:
             self.tray_manager.stop()
         
-        self.logger.info("ChatGPT Desktop Plus stopped")
+        if not self.profiler.stop(timeout=settings.runtime.shutdown_timeout):
+            self.logger.warning("Profile output not written before shutdown")
+        
+        stats = self.scheduler.get_stats()
+        self.logger.info(
+            f"Listening modes: active {stats['active_seconds']:.0f}s, "
+            f"duty cycle {stats['duty_cycle_seconds']:.0f}s, paused {stats['paused_seconds']:.0f}s; "
+            f"~{stats['cpu_saved_seconds']:.1f} CPU-seconds saved"
+        )
+        
+        self.last_shutdown_ms = (time.perf_counter() - started) * 1000
+        self.logger.info(f"ChatGPT Desktop Plus stopped in {self.last_shutdown_ms:.1f} ms")
+    
+    def report_time_to_quit(self) -> None:
+        """Log time from the quit request to process exit (registered with atexit).
+        
+        atexit handlers run after the interpreter has joined non-daemon
+        threads, so this covers everything that can delay exit.
+        """
+        if self._quit_requested_at is None:
+            return
+        
+        self.time_to_quit_ms = (time.perf_counter() - self._quit_requested_at) * 1000
+        self.logger.info(f"Time-to-quit: {self.time_to_quit_ms:.1f} ms")
+        if self.time_to_quit_ms > settings.runtime.shutdown_timeout * 1000:
+            self.logger.warning(
+                f"Time-to-quit exceeded {settings.runtime.shutdown_timeout * 1000:.0f} ms budget"
+            )
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="ChatGPT Desktop Plus")
+    parser.add_argument(
+        '--profile',
+        type=float,
+        nargs='?',
+        const=settings.runtime.profile_duration,
+        metavar='SECONDS',
+        help="profile all threads after startup (default: %(const)s seconds)"
+    )
+    args = parser.parse_args()
+    
     try:
-        assistant = ChatGPTDesktopPlus()
+        assistant = ChatGPTDesktopPlus(profile_on_start=args.profile)
+        atexit.register(assistant.report_time_to_quit)
         assistant.start()
     except Exception as e:
         logger = get_logger(__name__)
@@ -17,12 +17,14 @@ class TrayManager:
                  on_toggle_listening: Callable,
                  on_test_functions: dict,
                  on_quit: Callable,
-                 is_listening_func: Callable[[], bool]):
+                 is_listening_func: Callable[[], bool],
+                 on_profile: Optional[Callable] = None):
         self.logger = get_logger(__name__)
         self.on_toggle_listening = on_toggle_listening
         self.on_test_functions = on_test_functions
         self.on_quit = on_quit
         self.is_listening_func = is_listening_func
+        self.on_profile = on_profile
         
         self.tray_icon = None
         self.icon_image = self._load_icon()
@@ -56,6 +58,11 @@ class TrayManager:
             item("Test Button Click", self.on_test_functions.get('button_click')),
             item("Test Window Detection", self.on_test_functions.get('window_detection')),
             item("Show Hotwords", self.on_test_functions.get('show_hotwords')),
+            item(
+                f"Profile {settings.runtime.profile_duration:.0f}s",
+                self.on_profile,
+                visible=self.on_profile is not None
+            ),
             pystray.Menu.SEPARATOR,
             item("Quit", self.on_quit)
         )
@@ -70,7 +77,7 @@ class TrayManager:
                 menu=self._create_menu()
             )
             
-            tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
+            tray_thread = threading.Thread(target=self.tray_icon.run, name="tray", daemon=True)
             tray_thread.start()
             
             self.logger.info("System tray icon started successfully")
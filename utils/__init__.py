@@ -2,5 +2,7 @@
 
 from .logger import setup_logger, get_logger
 from .exceptions import VoiceAssistantError
+from .profiler import SamplingProfiler
+from .daemon_executor import DaemonThreadPoolExecutor
 
-__all__ = ['setup_logger', 'get_logger', 'VoiceAssistantError']
+__all__ = ['setup_logger', 'get_logger', 'VoiceAssistantError', 'SamplingProfiler', 'DaemonThreadPoolExecutor']
@@ -0,0 +1,102 @@
+"""Daemon thread pool executor for ChatGPT Desktop Plus."""
+
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, List
+
+class DaemonThreadPoolExecutor(Executor):
+    """Thread pool whose workers are daemon threads.
+
+    concurrent.futures.ThreadPoolExecutor joins its workers at interpreter
+    exit, so one blocked call (a microphone read or a slow recognition
+    request) holds the process open. These workers never block exit.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+        self.submitted = 0
+        self.finished = 0
+        self.active = 0
+
+    @property
+    def backlog(self) -> int:
+        """Number of submitted calls that have not started yet."""
+        with self._lock:
+            return self.submitted - self.finished - self.active
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule a call and return its future."""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            future = Future()
+            self._queue.put((future, fn, args, kwargs))
+            self.submitted += 1
+
+            outstanding = self.submitted - self.finished
+            if len(self._threads) < self.max_workers and outstanding > len(self._threads):
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.thread_name_prefix}_{len(self._threads)}",
+                    daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _worker(self) -> None:
+        """Run queued calls until shutdown."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                with self._lock:
+                    self.finished += 1
+                continue
+
+            with self._lock:
+                self.active += 1
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.finished += 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting work; optionally cancel queued calls and wait for workers."""
+        with self._lock:
+            self._shutdown = True
+
+        if cancel_futures:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and item[0].cancel():
+                    with self._lock:
+                        self.finished += 1
+
+        for _ in self._threads:
+            self._queue.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
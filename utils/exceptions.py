@@ -19,3 +19,7 @@ class HotwordDetectionError(VoiceAssistantError):
 class UIError(VoiceAssistantError):
     """Exception raised for UI-related errors."""
     pass
+
+class ConfigError(VoiceAssistantError):
+    """Exception raised for invalid configuration."""
+    pass
@@ -0,0 +1,137 @@
+"""On-demand sampling profiler for ChatGPT Desktop Plus."""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+import psutil
+from utils.logger import get_logger
+
+class SamplingProfiler:
+    """Samples the stacks of all threads and writes flamegraph-ready output."""
+
+    def __init__(self, output_dir: str, interval: float = 0.01,
+                 snapshot_func: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.logger = get_logger(__name__)
+        self.output_dir = output_dir
+        self.interval = interval
+        self.snapshot_func = snapshot_func
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is currently being collected."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float) -> bool:
+        """Start profiling in the background; returns False if already running."""
+        if self.running:
+            self.logger.warning("Profiler is already running")
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration,), name="profiler", daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"Profiling all threads for {duration:.0f}s...")
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Stop an in-progress profile early; output is still written.
+
+        With a timeout, waits up to that long for the output to be written;
+        returns False if the profile is still being written.
+        """
+        self._stop_event.set()
+        if timeout is not None and self.running:
+            self._thread.join(timeout)
+        return not self.running
+
+    @staticmethod
+    def _thread_cpu_times() -> Dict[int, float]:
+        """Get CPU seconds per native thread id."""
+        return {t.id: t.user_time + t.system_time for t in psutil.Process().threads()}
+
+    @staticmethod
+    def _format_stack(frame) -> str:
+        """Collapse a frame's stack into root-first 'a;b;c' form."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self, duration: float) -> None:
+        """Collect samples and write the output files."""
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        samples: Counter = Counter()
+        cpu_before = self._thread_cpu_times()
+        started = time.perf_counter()
+        deadline = started + duration
+
+        while time.perf_counter() < deadline and not self._stop_event.is_set():
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_id:
+                    continue
+                name = names.get(ident, str(ident))
+                stacks[f"{name};{self._format_stack(frame)}"] += 1
+                samples[name] += 1
+            self._stop_event.wait(self.interval)
+
+        elapsed = time.perf_counter() - started
+        cpu_after = self._thread_cpu_times()
+
+        try:
+            self._write_output(stacks, samples, cpu_before, cpu_after, elapsed)
+        except Exception as e:
+            self.logger.error(f"Failed to write profile: {e}")
+
+    def _write_output(self, stacks: Counter, samples: Counter, cpu_before: Dict[int, float],
+                      cpu_after: Dict[int, float], elapsed: float) -> None:
+        """Write collapsed stacks and a JSON summary."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        threads = {}
+        for thread in threading.enumerate():
+            if thread.native_id is None or thread.native_id not in cpu_after:
+                continue
+            cpu = cpu_after[thread.native_id] - cpu_before.get(thread.native_id, 0.0)
+            threads[thread.name] = {
+                'cpu_seconds': round(cpu, 4),
+                'cpu_percent': round(100 * cpu / elapsed, 2) if elapsed else 0.0,
+                'samples': samples.get(thread.name, 0),
+            }
+
+        snapshot = {}
+        if self.snapshot_func:
+            try:
+                snapshot = self.snapshot_func()
+            except Exception as e:
+                snapshot = {'error': str(e)}
+
+        summary = {
+            'duration_seconds': round(elapsed, 3),
+            'interval_seconds': self.interval,
+            'threads': threads,
+            'snapshot': snapshot,
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+
+        self.logger.info(f"Profile written to {base}.collapsed and {base}.json")
+        for name, stats in sorted(threads.items(), key=lambda item: -item[1]['cpu_seconds']):
+            self.logger.info(f"  {name}: {stats['cpu_seconds']:.3f}s CPU ({stats['cpu_percent']:.1f}%)")